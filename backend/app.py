@@ -1,8 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import pandas as pd
 import os
-from matching import calculate_neighborhood_matches
+from config import Config
+from data_processing.changelog import changes_since, load_changelog
+from matching import (
+    NeighborhoodCatalog,
+    ScoringKernel,
+    build_matches,
+    load_weight_profiles
+)
+from match_cache import MatchCache
+from pagination import (
+    CursorError,
+    StaleCursorError,
+    build_ranked_index,
+    decode_cursor,
+    encode_cursor
+)
+from responses import MatchEncoder
+from schema import ValidationError, compile_match_schema
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -24,12 +41,59 @@ def load_neighborhood_data():
 # Global variable to store neighborhood data
 NEIGHBORHOOD_DATA = load_neighborhood_data()
 
+# Changelog written by the data pipeline; its version identifies the dataset
+DATASET_CHANGELOG = load_changelog(os.path.join(os.path.dirname(__file__), 'data'))
+DATASET_VERSION = DATASET_CHANGELOG['version']
+
+def compile_scoring_kernels(catalog):
+    """Compile every configured weight profile against the neighborhood catalog"""
+    profiles = load_weight_profiles(Config.WEIGHT_PROFILES_FILE)
+    return {
+        name: ScoringKernel(catalog, weights)
+        for name, weights in profiles.items()
+    }
+
+# Columnar view of the data shared by all weight profiles
+NEIGHBORHOOD_CATALOG = NeighborhoodCatalog(NEIGHBORHOOD_DATA)
+
+# Weight profiles compiled once at startup, keyed by profile name
+SCORING_KERNELS = compile_scoring_kernels(NEIGHBORHOOD_CATALOG)
+
+# Pre-encoded static match fields for building /match responses
+MATCH_ENCODER = MatchEncoder(NEIGHBORHOOD_CATALOG)
+
+# Encoded /match responses keyed by normalized MatchRequest
+MATCH_CACHE = MatchCache(
+    ttl=Config.CACHE_TIMEOUT,
+    max_entries=Config.CACHE_MAX_ENTRIES,
+    max_bytes=Config.CACHE_MAX_BYTES
+)
+
+# Full rankings keyed by dataset version and Preferences, shared by all pages
+RANKING_CACHE = MatchCache(
+    ttl=Config.CACHE_TIMEOUT,
+    max_entries=Config.RANKING_CACHE_MAX_ENTRIES,
+    max_bytes=Config.RANKING_CACHE_MAX_BYTES,
+    size=lambda ranking: ranking.nbytes
+)
+
+# Validates /match payloads into a MatchRequest for the loaded weight profiles
+validate_match_request = compile_match_schema(
+    SCORING_KERNELS,
+    default_limit=Config.MAX_RESULTS,
+    max_limit=Config.MAX_PAGE_SIZE
+)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'neighborhoods_loaded': len(NEIGHBORHOOD_DATA)
+        'neighborhoods_loaded': len(NEIGHBORHOOD_DATA),
+        'dataset_version': DATASET_VERSION,
+        'weight_profiles': sorted(SCORING_KERNELS),
+        'match_cache': MATCH_CACHE.stats(),
+        'ranking_cache': RANKING_CACHE.stats()
     })
 
 @app.route('/match', methods=['POST'])
@@ -43,46 +107,50 @@ def find_matches():
         "safetyImportance": 1-5,
         "walkabilityImportance": 1-5,
         "familyFriendly": true|false,
-        "quietEnvironment": true|false
+        "quietEnvironment": true|false,
+        "profile": "<weight profile name>",  (optional, defaults to "default")
+        "limit": 1-100,  (optional page size, defaults to 3)
+        "cursor": "<next_cursor of the previous page>"  (optional)
     }
+    
+    Matches are ordered by match score, then by neighborhood id, so pages
+    never overlap or skip results while the dataset version is unchanged.
     """
     try:
         # Validate request
         if not request.is_json:
             return jsonify({'error': 'Request must be JSON'}), 400
         
-        preferences = request.get_json()
+        try:
+            match_request = validate_match_request(request.get_json(silent=True))
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Validate required fields
-        required_fields = ['budget', 'safetyImportance', 'walkabilityImportance', 'familyFriendly', 'quietEnvironment']
-        for field in required_fields:
-            if field not in preferences:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        preferences, limit, cursor = match_request
         
-        # Validate field values
-        if preferences['budget'] not in ['low', 'medium', 'high']:
-            return jsonify({'error': 'Budget must be low, medium, or high'}), 400
+        try:
+            offset = decode_cursor(cursor, preferences, DATASET_VERSION) if cursor is not None else 0
+        except StaleCursorError as e:
+            return jsonify({'error': str(e)}), 410
+        except CursorError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if not (1 <= preferences['safetyImportance'] <= 5):
-            return jsonify({'error': 'Safety importance must be between 1 and 5'}), 400
+        # Calculate matches, coalescing identical concurrent requests
+        def compute_ranking():
+            return build_ranked_index(SCORING_KERNELS[preferences.profile], preferences)
         
-        if not (1 <= preferences['walkabilityImportance'] <= 5):
-            return jsonify({'error': 'Walkability importance must be between 1 and 5'}), 400
+        def compute_response():
+            ranking = RANKING_CACHE.get_or_compute((DATASET_VERSION, preferences), compute_ranking)
+            positions, match_percentages = ranking.page(offset, limit)
+            ranked = build_matches(NEIGHBORHOOD_CATALOG, preferences, positions, match_percentages)
+            
+            next_cursor = None
+            if offset + limit < len(ranking):
+                next_cursor = encode_cursor(preferences, DATASET_VERSION, offset + limit)
+            return MATCH_ENCODER.encode_matches_response(ranked, len(NEIGHBORHOOD_DATA), next_cursor)
         
-        if not isinstance(preferences['familyFriendly'], bool):
-            return jsonify({'error': 'Family friendly must be true or false'}), 400
-        
-        if not isinstance(preferences['quietEnvironment'], bool):
-            return jsonify({'error': 'Quiet environment must be true or false'}), 400
-        
-        # Calculate matches
-        matches = calculate_neighborhood_matches(NEIGHBORHOOD_DATA, preferences)
-        
-        return jsonify({
-            'success': True,
-            'matches': matches,
-            'total_neighborhoods': len(NEIGHBORHOOD_DATA)
-        })
+        body = MATCH_CACHE.get_or_compute(match_request, compute_response)
+        return Response(body, mimetype='application/json')
     
     except Exception as e:
         print(f"Error in find_matches: {e}")
@@ -93,9 +161,29 @@ def get_all_neighborhoods():
     """Get all available neighborhoods"""
     return jsonify({
         'neighborhoods': NEIGHBORHOOD_DATA,
-        'count': len(NEIGHBORHOOD_DATA)
+        'count': len(NEIGHBORHOOD_DATA),
+        'version': DATASET_VERSION
     })
 
+@app.route('/neighborhoods/changes', methods=['GET'])
+def get_neighborhood_changes():
+    """
+    Get changes to the neighborhood catalog since a dataset version
+    
+    Query parameters:
+        since: dataset version the client last synced (from /neighborhoods)
+    """
+    since = request.args.get('since', type=int)
+    if since is None or since < 0:
+        return jsonify({'error': 'since must be a non-negative integer dataset version'}), 400
+    
+    try:
+        changes = changes_since(DATASET_CHANGELOG, since)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(changes)
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
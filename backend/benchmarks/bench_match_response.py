@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark allocation and latency of building /match responses
+Compares dict construction plus jsonify against the pre-encoded MatchEncoder
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import jsonify
+
+import app as api
+from matching import as_preferences, rank_matches, static_match_fields
+
+PREFERENCES = {
+    'budget': 'medium',
+    'safetyImportance': 4,
+    'walkabilityImportance': 3,
+    'familyFriendly': True,
+    'quietEnvironment': False
+}
+
+KERNEL = api.SCORING_KERNELS['default']
+TOTAL = len(api.NEIGHBORHOOD_DATA)
+
+def jsonify_response(ranked):
+    """Response construction as done before pre-encoded fragments"""
+    matches = []
+    for position, match_score, match_reasons, component_scores in ranked:
+        match = static_match_fields(KERNEL.catalog.rows[position])
+        match['matchScore'] = match_score
+        match['matchReasons'] = match_reasons
+        match['componentScores'] = component_scores
+        matches.append(match)
+    return jsonify({'success': True, 'matches': matches, 'total_neighborhoods': TOTAL})
+
+def encoder_response(ranked):
+    body = api.MATCH_ENCODER.encode_matches_response(ranked, TOTAL)
+    return api.Response(body, mimetype='application/json')
+
+def post_uncached(client):
+    """POST /match with the response and ranking caches emptied first"""
+    api.MATCH_CACHE.clear()
+    api.RANKING_CACHE.clear()
+    return client.post('/match', json=PREFERENCES)
+
+def measure(func, iterations):
+    """Return (microseconds per call, bytes allocated per call, peak bytes)"""
+    func()
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed_us = (time.perf_counter() - start) / iterations * 1e6
+    
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    for _ in range(iterations):
+        func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+    return elapsed_us, allocated / iterations, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    
+    ranked = rank_matches(KERNEL, as_preferences(PREFERENCES))
+    client = api.app.test_client()
+    
+    cases = []
+    with api.app.app_context():
+        cases.append(('jsonify (response only)', lambda: jsonify_response(ranked)))
+        cases.append(('encoder (response only)', lambda: encoder_response(ranked)))
+        cases.append(('POST /match (end to end)', lambda: post_uncached(client)))
+        cases.append(('POST /match (cache hit)', lambda: client.post('/match', json=PREFERENCES)))
+        
+        print(f"{'case':<28} {'latency (us)':>14} {'retained B/req':>16} {'peak (B)':>12}")
+        for name, func in cases:
+            latency_us, allocated, peak = measure(func, args.iterations)
+            print(f"{name:<28} {latency_us:>14.1f} {allocated:>16.1f} {peak:>12}")
+
+if __name__ == "__main__":
+    main()
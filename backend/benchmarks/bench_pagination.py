@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark cursor pagination over ranked match results
+Compares rescoring and re-sorting the catalog for every page against
+slicing a ranking built once for the first page
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_weight_profiles import generate_neighborhoods
+from matching import DEFAULT_WEIGHTS, NeighborhoodCatalog, ScoringKernel, as_preferences, build_matches
+from pagination import build_ranked_index, decode_cursor, encode_cursor
+
+PREFERENCES = as_preferences({
+    'budget': 'medium',
+    'safetyImportance': 4,
+    'walkabilityImportance': 3,
+    'familyFriendly': True,
+    'quietEnvironment': False
+})
+
+def time_per_call(func, number):
+    """Best per-call time in milliseconds over several runs"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e3
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--number', type=int, default=5)
+    args = parser.parse_args()
+    
+    catalog = NeighborhoodCatalog(generate_neighborhoods(args.rows))
+    kernel = ScoringKernel(catalog, DEFAULT_WEIGHTS)
+    ranking = build_ranked_index(kernel, PREFERENCES)
+    
+    def rescore_page(offset):
+        """Page as served without a cached ranking: rank everything up to the page end"""
+        positions, match_percentages = kernel.rank(PREFERENCES, offset + args.page_size)
+        return build_matches(catalog, PREFERENCES, positions[offset:], match_percentages[offset:])
+    
+    def cursor_page(offset):
+        cursor = encode_cursor(PREFERENCES, 0, offset)
+        positions, match_percentages = ranking.page(decode_cursor(cursor, PREFERENCES, 0), args.page_size)
+        return build_matches(catalog, PREFERENCES, positions, match_percentages)
+    
+    # Both approaches must return the same pages
+    for offset in (0, args.rows // 2):
+        assert rescore_page(offset) == cursor_page(offset)
+    
+    print(f"{args.rows} neighborhoods, {args.page_size} per page, ranking index {ranking.nbytes / 1e6:.1f} MB")
+    print(f"build ranking (first page miss): {time_per_call(lambda: build_ranked_index(kernel, PREFERENCES), args.number):.2f} ms")
+    print(f"{'offset':>10} {'rescore (ms)':>14} {'cursor (ms)':>14} {'speedup':>10}")
+    for offset in (0, 1_000, args.rows // 2, args.rows - args.page_size):
+        rescore_ms = time_per_call(lambda: rescore_page(offset), args.number)
+        cursor_ms = time_per_call(lambda: cursor_page(offset), args.number * 100)
+        print(f"{offset:>10} {rescore_ms:>14.2f} {cursor_ms:>14.3f} {rescore_ms / cursor_ms:>10.0f}x")
+
+if __name__ == "__main__":
+    main()
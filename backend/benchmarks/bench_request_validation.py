@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of /match validation and dispatch overhead per request
+Compares the previous chain of if checks plus a JSON cache key against the
+compiled request schema producing a hashable Preferences key
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from match_cache import MatchCache
+from schema import compile_match_schema
+
+PAYLOAD = {
+    'budget': 'medium',
+    'safetyImportance': 4,
+    'walkabilityImportance': 3,
+    'familyFriendly': True,
+    'quietEnvironment': False
+}
+
+def legacy_validate(preferences):
+    """Validation as previously done inline in find_matches"""
+    required_fields = ['budget', 'safetyImportance', 'walkabilityImportance', 'familyFriendly', 'quietEnvironment']
+    for field in required_fields:
+        if field not in preferences:
+            return f'Missing required field: {field}'
+    if preferences['budget'] not in ['low', 'medium', 'high']:
+        return 'Budget must be low, medium, or high'
+    if not (1 <= preferences['safetyImportance'] <= 5):
+        return 'Safety importance must be between 1 and 5'
+    if not (1 <= preferences['walkabilityImportance'] <= 5):
+        return 'Walkability importance must be between 1 and 5'
+    if not isinstance(preferences['familyFriendly'], bool):
+        return 'Family friendly must be true or false'
+    if not isinstance(preferences['quietEnvironment'], bool):
+        return 'Quiet environment must be true or false'
+    return None
+
+def legacy_key(preferences, profile='default'):
+    fields = ('budget', 'safetyImportance', 'walkabilityImportance', 'familyFriendly', 'quietEnvironment')
+    return json.dumps([profile] + [preferences[field] for field in fields])
+
+def time_per_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=100_000)
+    args = parser.parse_args()
+    
+    validate = compile_match_schema(['default'])
+    legacy_cache = MatchCache(ttl=300)
+    schema_cache = MatchCache(ttl=300)
+    response = b'{}'
+    
+    def legacy_dispatch():
+        legacy_validate(PAYLOAD)
+        return legacy_cache.get_or_compute(legacy_key(PAYLOAD), lambda: response)
+    
+    def schema_dispatch():
+        return schema_cache.get_or_compute(validate(PAYLOAD), lambda: response)
+    
+    cases = [
+        ('legacy validation', lambda: legacy_validate(PAYLOAD)),
+        ('compiled schema', lambda: validate(PAYLOAD)),
+        ('legacy validation + cache hit', legacy_dispatch),
+        ('compiled schema + cache hit', schema_dispatch)
+    ]
+    
+    print(f"{'case':<32} {'us/request':>12}")
+    for name, func in cases:
+        print(f"{name:<32} {time_per_call(func, args.number):>12.2f}")
+
+if __name__ == "__main__":
+    main()
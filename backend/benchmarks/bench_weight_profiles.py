@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request scoring cost of custom weight profiles
+Compares the default profile against custom profiles compiled at load time
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from matching import (
+    DEFAULT_WEIGHTS,
+    NeighborhoodCatalog,
+    ScoringKernel,
+    calculate_neighborhood_matches
+)
+
+CUSTOM_WEIGHTS = {
+    'budget': 0.25,
+    'safety': 0.20,
+    'walkability': 0.35,
+    'family': 0.05,
+    'quiet': 0.15
+}
+
+PREFERENCES = {
+    'budget': 'medium',
+    'safetyImportance': 4,
+    'walkabilityImportance': 3,
+    'familyFriendly': True,
+    'quietEnvironment': False
+}
+
+def generate_neighborhoods(count, seed=42):
+    """Generate a synthetic neighborhood catalog"""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': str(i),
+            'name': f'Neighborhood {i}',
+            'avg_rent': rng.randint(500, 4000),
+            'safety_score': round(rng.uniform(1, 5), 1),
+            'walkability': round(rng.uniform(1, 5), 1),
+            'family_friendly': round(rng.uniform(1, 5), 1),
+            'noise_level': round(rng.uniform(1, 5), 1),
+            'description': 'Synthetic neighborhood',
+            'highlights': 'Parks;Shops'
+        }
+        for i in range(count)
+    ]
+
+def time_per_call(func, repeat):
+    """Best per-call time in microseconds over several runs"""
+    number = max(1, repeat // 5)
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[12, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+    
+    print(f"{'rows':>10} {'default (us)':>14} {'custom (us)':>14} {'ratio':>8}")
+    for rows in args.rows:
+        neighborhoods = generate_neighborhoods(rows)
+        catalog = NeighborhoodCatalog(neighborhoods)
+        default_kernel = ScoringKernel(catalog, DEFAULT_WEIGHTS)
+        custom_kernel = ScoringKernel(catalog, CUSTOM_WEIGHTS)
+        
+        default_us = time_per_call(
+            lambda: calculate_neighborhood_matches(neighborhoods, PREFERENCES, kernel=default_kernel), args.repeat)
+        custom_us = time_per_call(
+            lambda: calculate_neighborhood_matches(neighborhoods, PREFERENCES, kernel=custom_kernel), args.repeat)
+        
+        print(f"{rows:>10} {default_us:>14.1f} {custom_us:>14.1f} {custom_us / default_us:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -23,8 +23,16 @@ class Config:
     NEIGHBORHOOD_DATA_FILE = os.environ.get('NEIGHBORHOOD_DATA_FILE') or 'neighborhood_data.csv'
     
     # API settings
-    MAX_RESULTS = int(os.environ.get('MAX_RESULTS', 3))
+    MAX_RESULTS = int(os.environ.get('MAX_RESULTS', 3))  # Default /match page size
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
     CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', 300))  # 5 minutes
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+    CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 16 * 1024 * 1024))  # 16 MB
+    RANKING_CACHE_MAX_ENTRIES = int(os.environ.get('RANKING_CACHE_MAX_ENTRIES', 256))
+    RANKING_CACHE_MAX_BYTES = int(os.environ.get('RANKING_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 64 MB
+    
+    # Matching settings
+    WEIGHT_PROFILES_FILE = os.environ.get('WEIGHT_PROFILES_FILE') or os.path.join(DATA_PATH, 'weight_profiles.json')
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -38,7 +46,9 @@ class ProductionConfig(Config):
     DEBUG = False
     SECRET_KEY = os.environ.get('SECRET_KEY')
     
-    if not SECRET_KEY:
+    # Only enforce when actually running in production so that the module
+    # can still be imported by the API and tooling in other environments
+    if not SECRET_KEY and os.environ.get('FLASK_ENV') == 'production':
         raise ValueError("SECRET_KEY environment variable must be set in production")
 
 class TestingConfig(Config):
@@ -0,0 +1,148 @@
+"""
+Content-addressed artifact cache for NeighborFit pipeline stages
+Stage outputs are stored under a hash of the stage's inputs and code, so a
+stage whose inputs and code are unchanged can be skipped
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import pandas as pd
+
+MAX_ENTRIES_PER_STAGE = 5
+
+def code_version(*modules):
+    """Hash of the source code of the modules a stage depends on"""
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(inspect.getsource(module).encode('utf-8'))
+    return digest.hexdigest()
+
+def _stable_cell(value):
+    """Stable string form of an object cell, which may be a list or dict"""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+def frame_fingerprint(df):
+    """Content hash of a DataFrame, including column names and dtypes"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    
+    # Object columns may hold unhashable cells such as list-valued highlights
+    object_columns = [col for col, dtype in df.dtypes.items() if dtype == object]
+    if object_columns:
+        df = df.copy(deep=False)
+        for col in object_columns:
+            df[col] = df[col].map(_stable_cell)
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+class ArtifactCache:
+    """
+    Stores DataFrame artifacts on disk keyed by stage name and input hash
+    
+    Only the max_entries most recently used artifacts of each stage are kept.
+    """
+    
+    def __init__(self, cache_dir, max_entries=MAX_ENTRIES_PER_STAGE):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+    
+    @staticmethod
+    def key(stage, version, *input_fingerprints):
+        """Cache key for a stage run from its code version and input fingerprints"""
+        digest = hashlib.sha256()
+        for part in (stage, version) + input_fingerprints:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    def _paths(self, stage, key):
+        stage_dir = os.path.join(self.cache_dir, stage)
+        return os.path.join(stage_dir, f'{key}.pkl'), os.path.join(stage_dir, f'{key}.json')
+    
+    def load(self, stage, key):
+        """Return (DataFrame, metadata) for a cached artifact, or None on a miss"""
+        artifact_path, meta_path = self._paths(stage, key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            df = pd.read_pickle(artifact_path)
+            os.utime(meta_path)  # Mark as recently used for prune()
+            return df, meta
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable cache entry {artifact_path}: {e}")
+            return None
+    
+    def save(self, stage, key, df, duration):
+        """Store an artifact with the time it took to compute"""
+        artifact_path, meta_path = self._paths(stage, key)
+        os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
+        
+        df.to_pickle(artifact_path)
+        with open(meta_path, 'w') as f:
+            json.dump({'stage': stage, 'duration': duration, 'rows': len(df), 'created_at': time.time()}, f)
+        
+        self.prune(stage)
+    
+    def prune(self, stage):
+        """Delete all but the max_entries most recently used artifacts of a stage"""
+        stage_dir = os.path.join(self.cache_dir, stage)
+        meta_paths = [
+            os.path.join(stage_dir, name)
+            for name in os.listdir(stage_dir)
+            if name.endswith('.json')
+        ]
+        meta_paths.sort(key=os.path.getmtime, reverse=True)
+        
+        for meta_path in meta_paths[self.max_entries:]:
+            for path in (meta_path[:-len('.json')] + '.pkl', meta_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+    
+    def run_stage(self, stage, version, inputs, compute, force=False):
+        """
+        Run a stage through the cache
+        
+        Args:
+            stage: Stage name
+            version: Stage code version (see code_version)
+            inputs: Input DataFrames of the stage
+            compute: Zero-argument callable producing the stage's DataFrame
+            force: Recompute even if a cached artifact exists
+        
+        Returns:
+            (DataFrame, run record) where the record notes the cache status,
+            the elapsed time and the time saved by a cache hit
+        """
+        key = self.key(stage, version, *(frame_fingerprint(df) for df in inputs))
+        start = time.perf_counter()
+        
+        cached = None if force else self.load(stage, key)
+        if cached is not None:
+            df, meta = cached
+            elapsed = time.perf_counter() - start
+            return df, {
+                'stage': stage,
+                'status': 'hit',
+                'elapsed': elapsed,
+                'saved': max(0.0, meta['duration'] - elapsed)
+            }
+        
+        df = compute()
+        duration = time.perf_counter() - start
+        self.save(stage, key, df, duration)
+        return df, {
+            'stage': stage,
+            'status': 'forced' if force else 'miss',
+            'elapsed': duration,
+            'saved': 0.0
+        }
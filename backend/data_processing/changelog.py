@@ -0,0 +1,176 @@
+"""
+Dataset versioning for NeighborFit
+Computes a keyed columnar diff between two versions of the clean neighborhood
+data and keeps a versioned changelog so clients can sync incrementally
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+CHANGELOG_FILE = 'changelog.json'
+MAX_CHANGELOG_ENTRIES = 100
+
+def _records(df):
+    """DataFrame rows as JSON-safe dictionaries (missing values become None)"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def compute_diff(previous_df, current_df, key='id'):
+    """
+    Diff two versions of the neighborhood data keyed by id
+    
+    Both versions are aligned on the key once and every column is compared
+    as a whole, so only rows that actually changed are materialized.
+    
+    Returns:
+        Dictionary with 'added' (full records), 'removed' (ids) and
+        'changed' (id plus the new values of the changed fields)
+    """
+    previous_df = previous_df.set_index(previous_df[key].astype(str), drop=False)
+    current_df = current_df.set_index(current_df[key].astype(str), drop=False)
+    previous_df = previous_df[~previous_df.index.duplicated()]
+    current_df = current_df[~current_df.index.duplicated()]
+    
+    in_previous = current_df.index.isin(previous_df.index)
+    in_current = previous_df.index.isin(current_df.index)
+    
+    added = _records(current_df[~in_previous])
+    removed = previous_df.loc[~in_current, key].tolist()
+    
+    new = current_df[in_previous]
+    old = previous_df.loc[new.index]
+    
+    # One boolean mask per column over all matched rows
+    columns = [col for col in current_df.columns if col != key]
+    masks = []
+    for col in columns:
+        if col in old.columns:
+            masks.append(((old[col] != new[col]) & ~(old[col].isna() & new[col].isna())).to_numpy())
+        else:
+            masks.append(new[col].notna().to_numpy())
+    dropped_columns = [col for col in previous_df.columns if col not in current_df.columns]
+    masks.extend(np.ones(len(new), dtype=bool) for _ in dropped_columns)
+    columns.extend(dropped_columns)
+    
+    changed = []
+    if columns and len(new):
+        mask_matrix = np.column_stack(masks)
+        changed_rows = np.flatnonzero(mask_matrix.any(axis=1))
+        
+        for row, record in zip(changed_rows, _records(new.iloc[changed_rows])):
+            fields = {
+                col: record.get(col)
+                for col, is_changed in zip(columns, mask_matrix[row])
+                if is_changed
+            }
+            changed.append({key: record[key], 'fields': fields})
+    
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+def is_empty(diff):
+    return not (diff['added'] or diff['removed'] or diff['changed'])
+
+def changelog_path(data_dir):
+    return os.path.join(data_dir, CHANGELOG_FILE)
+
+def load_changelog(data_dir):
+    """Load the changelog, or an empty one at version 0 if it is missing or unreadable"""
+    try:
+        with open(changelog_path(data_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        print(f"Error loading changelog: {e}. Starting from version 0.")
+    return {'version': 0, 'oldest_version': 0, 'entries': []}
+
+def record_changes(data_dir, diff, max_entries=MAX_CHANGELOG_ENTRIES):
+    """
+    Append a diff to the changelog as a new dataset version
+    
+    Empty diffs do not create a version. Only the newest max_entries versions
+    are kept; clients older than oldest_version need a full sync.
+    
+    Returns:
+        The current dataset version
+    """
+    changelog = load_changelog(data_dir)
+    if is_empty(diff):
+        return changelog['version']
+    
+    version = changelog['version'] + 1
+    changelog['entries'].append({
+        'version': version,
+        'created_at': datetime.now().isoformat(),
+        **diff
+    })
+    changelog['entries'] = changelog['entries'][-max_entries:]
+    changelog['version'] = version
+    changelog['oldest_version'] = changelog['entries'][0]['version'] - 1
+    
+    # Write a temporary file and move it into place so readers never see a partial changelog
+    os.makedirs(data_dir, exist_ok=True)
+    path = changelog_path(data_dir)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(changelog, f)
+    os.replace(path + '.tmp', path)
+    
+    return version
+
+def changes_since(changelog, since, key='id'):
+    """
+    Net changes between dataset version `since` and the current version
+    
+    Successive diffs are folded per id: a neighborhood added and later
+    changed is reported once as added with its latest values, one removed
+    and re-added is reported as changed with all of its fields.
+    
+    Raises:
+        ValueError: if since is newer than the current version
+    
+    Returns:
+        Dictionary with version, since, added, removed and changed, or with
+        full_sync_required set when since predates the retained history
+    """
+    current = changelog['version']
+    if since > current:
+        raise ValueError(f'Unknown dataset version: {since}')
+    if since < changelog['oldest_version']:
+        return {'version': current, 'since': since, 'full_sync_required': True}
+    
+    # id -> [existed at `since`, current record or None, changed fields, was replaced]
+    state = {}
+    for entry in changelog['entries']:
+        if entry['version'] <= since:
+            continue
+        
+        for record in entry['added']:
+            item = state.setdefault(record[key], [False, None, {}, False])
+            item[3] = item[3] or item[0]
+            item[1] = dict(record)
+        for record_id in entry['removed']:
+            item = state.setdefault(record_id, [True, None, {}, False])
+            item[1] = None
+            item[2] = {}
+        for change in entry['changed']:
+            item = state.setdefault(change[key], [True, None, {}, False])
+            if item[1] is not None:
+                item[1].update(change['fields'])
+            else:
+                item[2].update(change['fields'])
+    
+    added, removed, changed = [], [], []
+    for record_id, (existed, record, fields, replaced) in state.items():
+        if not existed:
+            if record is not None:
+                added.append(record)
+        elif record is None and not fields:
+            removed.append(record_id)
+        elif replaced:
+            changed.append({key: record_id, 'fields': {k: v for k, v in record.items() if k != key}})
+        else:
+            changed.append({key: record_id, 'fields': fields})
+    
+    return {'version': current, 'since': since, 'added': added, 'removed': removed, 'changed': changed}
@@ -4,10 +4,15 @@ Handles missing values, data validation, and normalization
 """
 
 import pandas as pd
-import numpy as np
 import os
+import json
 from datetime import datetime
 
+try:
+    from .stats import collect_stats
+except ImportError:
+    from stats import collect_stats
+
 def load_raw_data(filename='raw_neighborhood_data.csv'):
     """Load raw neighborhood data from CSV"""
     data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
@@ -58,9 +63,12 @@ def handle_missing_values(df):
     # Fill missing scores with median values
     score_columns = ['safety_score', 'walkability', 'family_friendly', 'noise_level']
     
+    # One pass over the score columns for all medians
+    stats = collect_stats(df[[col for col in score_columns if col in df.columns]])
+    
     for col in score_columns:
         if col in df.columns:
-            median_value = df[col].median()
+            median_value = stats.median(col)
             df[col] = df[col].fillna(median_value)
             print(f"Filled {col} missing values with median: {median_value:.2f}")
     
@@ -198,15 +206,23 @@ def remove_duplicates(df):
     
     return df
 
-def generate_data_quality_report(df):
-    """Generate a data quality report"""
+def generate_data_quality_report(df, filename='data_quality_report.json'):
+    """Generate a data quality report from a single statistics pass and save it as JSON"""
+    stats = collect_stats(df)
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'total_neighborhoods': len(df),
+        'columns': list(df.columns),
+        'statistics': stats.to_dict()
+    }
+    
     print("\n=== DATA QUALITY REPORT ===")
     print(f"Total neighborhoods: {len(df)}")
     print(f"Columns: {list(df.columns)}")
     
     # Check for missing values
-    missing_values = df.isnull().sum()
-    if missing_values.sum() > 0:
+    missing_values = stats.null_counts()
+    if sum(missing_values.values()) > 0:
         print("\nMissing values:")
         for col, count in missing_values.items():
             if count > 0:
@@ -215,27 +231,48 @@ def generate_data_quality_report(df):
         print("\nNo missing values found!")
     
     # Summary statistics for numeric columns
-    numeric_columns = df.select_dtypes(include=[np.number]).columns
+    numeric_columns = stats.numeric_columns()
     if len(numeric_columns) > 0:
         print(f"\nNumeric column statistics:")
-        print(df[numeric_columns].describe())
+        print(pd.DataFrame({col: report['statistics']['columns'][col] for col in numeric_columns}))
     
     # Rent distribution
     if 'avg_rent' in df.columns:
+        rent_stats = stats.columns['avg_rent']
         print(f"\nRent distribution:")
-        print(f"  Min: ${df['avg_rent'].min():,.0f}")
-        print(f"  Max: ${df['avg_rent'].max():,.0f}")
-        print(f"  Mean: ${df['avg_rent'].mean():,.0f}")
-        print(f"  Median: ${df['avg_rent'].median():,.0f}")
+        print(f"  Min: ${rent_stats.min:,.0f}")
+        print(f"  Max: ${rent_stats.max:,.0f}")
+        print(f"  Mean: ${rent_stats.mean:,.0f}")
+        print(f"  Median: ${stats.median('avg_rent'):,.0f}")
+    
+    if filename:
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        os.makedirs(data_dir, exist_ok=True)
+        filepath = os.path.join(data_dir, filename)
+        with open(filepath, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nQuality report saved to {filepath}")
     
     print("=== END REPORT ===\n")
+    return report
 
-def clean_all_data():
-    """Main function to clean all neighborhood data"""
+def clean_all_data(df=None, report_filename='data_quality_report.json'):
+    """
+    Main function to clean all neighborhood data
+    
+    Args:
+        df: Optional raw DataFrame, e.g. handed over in memory by the fetch
+            stage; the raw CSV is loaded when omitted
+        report_filename: Where to save the JSON quality report in the data
+            directory, or None to skip saving it
+    """
     print("Starting data cleaning process...")
     
     # Load raw data
-    df = load_raw_data()
+    if df is None:
+        df = load_raw_data()
+    else:
+        df = df.copy()
     
     # Apply all cleaning steps
     df = validate_data_types(df)
@@ -247,7 +284,7 @@ def clean_all_data():
     df = add_derived_fields(df)
     
     # Generate quality report
-    generate_data_quality_report(df)
+    generate_data_quality_report(df, report_filename)
     
     return df
 
@@ -6,6 +6,12 @@ Simulates fetching neighborhood data from various sources
 import pandas as pd
 import random
 import os
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 def generate_sample_neighborhoods():
@@ -174,12 +180,105 @@ def simulate_web_scraping():
     
     return []
 
+# Guards fetch stats updated from concurrent page fetches
+_STATS_LOCK = threading.Lock()
+
+def _record_request(stats, latency=None, size=0, retry_reason=None):
+    with _STATS_LOCK:
+        stats['requests'] += 1
+        if latency is not None:
+            stats['latencies'].append(latency)
+        stats['bytes'] += size
+        if retry_reason is not None:
+            stats['retries'] += 1
+            stats['retry_reasons'][retry_reason] = stats['retry_reasons'].get(retry_reason, 0) + 1
+
+def new_fetch_stats():
+    """Counters filled in by fetch_paginated"""
+    return {
+        'requests': 0,
+        'retries': 0,
+        'retry_reasons': {},
+        'latencies': [],
+        'bytes': 0
+    }
+
+def fetch_page(base_url, page, page_size, stats, max_retries=5, backoff=0.1, timeout=10):
+    """
+    Fetch one page from a paginated neighborhood API, retrying transient failures
+    
+    Retries 429 responses (honouring a numeric Retry-After), 5xx responses
+    and connection errors with jittered exponential backoff. Raises
+    RuntimeError on other 4xx responses or once retries are exhausted.
+    """
+    url = f"{base_url}/neighborhoods?page={page}&page_size={page_size}"
+    
+    for attempt in range(max_retries + 1):
+        start = time.perf_counter()
+        delay = backoff * (2 ** attempt)
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                body = response.read()
+            _record_request(stats, time.perf_counter() - start, len(body))
+            return json.loads(body)
+        except urllib.error.HTTPError as e:
+            if e.code != 429 and e.code < 500:
+                _record_request(stats, time.perf_counter() - start)
+                raise RuntimeError(f"Request to {url} failed with HTTP {e.code}") from e
+            latency = time.perf_counter() - start
+            reason = str(e.code)
+            if e.code == 429 and e.headers.get('Retry-After'):
+                # The HTTP-date form is not supported; keep the computed backoff
+                try:
+                    delay = max(delay, float(e.headers['Retry-After']))
+                except ValueError:
+                    pass
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            latency = None
+            reason = type(e).__name__
+        
+        if attempt == max_retries:
+            _record_request(stats, latency)
+            raise RuntimeError(f"Giving up on {url} after {max_retries} retries ({reason})")
+        _record_request(stats, latency, retry_reason=reason)
+        # Jitter so concurrent fetches do not retry in lockstep
+        time.sleep(delay * random.uniform(1, 1.5))
+
+def fetch_paginated(base_url, page_size=500, workers=1, stats=None, **retry_options):
+    """
+    Fetch all neighborhoods from a paginated HTTP source
+    
+    The first page reports the number of pages; the rest are fetched with
+    `workers` concurrent requests.
+    """
+    if stats is None:
+        stats = new_fetch_stats()
+    
+    first = fetch_page(base_url, 1, page_size, stats, **retry_options)
+    pages = range(2, first['pages'] + 1)
+    
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            rest = list(executor.map(lambda page: fetch_page(base_url, page, page_size, stats, **retry_options), pages))
+    else:
+        rest = [fetch_page(base_url, page, page_size, stats, **retry_options) for page in pages]
+    
+    records = list(first['items'])
+    for result in rest:
+        records.extend(result['items'])
+    return records
+
 def fetch_all_data():
     """Main function to fetch all neighborhood data"""
     print("Starting data fetch process...")
     
     # Combine data from different sources
-    api_data = simulate_api_fetch()
+    upstream_url = os.environ.get('UPSTREAM_API_URL')
+    if upstream_url:
+        print(f"Fetching from upstream API at {upstream_url}...")
+        api_data = fetch_paginated(upstream_url.rstrip('/'))
+    else:
+        api_data = simulate_api_fetch()
     scraping_data = simulate_web_scraping()
     
     # Combine all data sources
@@ -0,0 +1,265 @@
+"""
+Single-pass column statistics for NeighborFit data processing
+Computes null counts, min/max/mean/std and percentiles for every column at
+once, exactly for small data and with mergeable quantile sketches for large
+or partitioned data
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75)
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch
+    
+    Values are kept in levels of compactors; an item on level h stands for
+    2**h original values. When a level grows past its capacity it is sorted
+    and every other item is promoted to the next level, so memory stays
+    O(k log(n / k)) and the rank error is roughly O(log(n / k) / k).
+    
+    The choice of which items to promote is random; the default fixed seed
+    makes results reproducible, since medians are used to impute data.
+    """
+    
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    def update(self, values):
+        """Add an array of non-null values"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+    
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for height, items in enumerate(other.levels):
+            self.levels[height] = np.concatenate([self.levels[height], items])
+        self.count += other.count
+        self._compress()
+        return self
+    
+    def _compress(self):
+        height = 0
+        while height < len(self.levels):
+            items = self.levels[height]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # Keep one item back on odd sizes so total weight is preserved
+                kept = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(kept)]
+                promoted = pairs[self._rng.integers(2)::2]
+                
+                self.levels[height] = kept
+                if height + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+            height += 1
+    
+    def quantiles(self, qs):
+        """Approximate quantiles for a sequence of fractions in [0, 1]"""
+        if self.count == 0:
+            return [float('nan') for _ in qs]
+        
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(items), 2 ** height, dtype=np.float64)
+            for height, items in enumerate(self.levels)
+        ])
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side='left')
+        return [float(values[min(position, len(values) - 1)]) for position in positions]
+
+class ColumnStats:
+    """Running statistics for one column"""
+    
+    def __init__(self, numeric, exact_limit, sketch_k):
+        self.numeric = numeric
+        self.exact_limit = exact_limit
+        self.sketch_k = sketch_k
+        self.count = 0
+        self.nulls = 0
+        self.min = float('nan')
+        self.max = float('nan')
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.exact_values = []
+        self.sketch = None
+    
+    @property
+    def exact(self):
+        return self.sketch is None
+    
+    def update(self, series):
+        """Update from one chunk of a column"""
+        nulls = series.isnull()
+        null_count = int(nulls.sum())
+        self.nulls += null_count
+        
+        if not self.numeric:
+            self.count += len(series) - null_count
+            return
+        
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)[~nulls.to_numpy()]
+        if len(values) == 0:
+            return
+        
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+        self._combine_moments(len(values), chunk_mean, chunk_m2, float(values.min()), float(values.max()))
+        
+        if self.exact:
+            self.exact_values.append(values)
+            if self.count > self.exact_limit:
+                self._switch_to_sketch()
+        else:
+            self.sketch.update(values)
+    
+    def _combine_moments(self, count, mean, m2, minimum, maximum):
+        # Chan et al. parallel update of mean and sum of squared deviations
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = minimum if np.isnan(self.min) else min(self.min, minimum)
+        self.max = maximum if np.isnan(self.max) else max(self.max, maximum)
+    
+    def _switch_to_sketch(self):
+        self.sketch = QuantileSketch(self.sketch_k)
+        for values in self.exact_values:
+            self.sketch.update(values)
+        self.exact_values = []
+    
+    def merge(self, other):
+        """Fold statistics of the same column from another partition"""
+        self.nulls += other.nulls
+        
+        if not self.numeric:
+            self.count += other.count
+            return self
+        
+        if other.count:
+            self._combine_moments(other.count, other.mean, other.m2, other.min, other.max)
+        
+        if self.exact and other.exact and self.count <= self.exact_limit:
+            self.exact_values.extend(other.exact_values)
+            return self
+        
+        if self.exact:
+            self._switch_to_sketch()
+        if other.exact:
+            for values in other.exact_values:
+                self.sketch.update(values)
+        else:
+            self.sketch.merge(other.sketch)
+        return self
+    
+    def quantiles(self, qs):
+        """Exact (linear interpolation, as pandas) or sketched quantiles"""
+        if self.count == 0:
+            return [float('nan') for _ in qs]
+        if self.exact:
+            values = np.concatenate(self.exact_values)
+            return [float(value) for value in np.quantile(values, qs)]
+        return self.sketch.quantiles(qs)
+    
+    @property
+    def std(self):
+        # Sample standard deviation, as pandas describe()
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float('nan')
+    
+    def to_dict(self, percentiles):
+        stats = {'count': self.count, 'nulls': self.nulls}
+        if not self.numeric:
+            return stats
+        
+        stats.update({
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'mean': self.mean if self.count else None,
+            'std': self.std if self.count > 1 else None,
+            'exact': self.exact
+        })
+        for q, value in zip(percentiles, self.quantiles(percentiles)):
+            stats[f'{q * 100:g}%'] = value if self.count else None
+        return stats
+
+class StatsCollector:
+    """
+    Collects ColumnStats for every column of one or more DataFrame chunks
+    
+    Columns are scanned once per chunk; collectors built over separate
+    partitions can be combined with merge().
+    """
+    
+    def __init__(self, exact_limit=100_000, sketch_k=200, percentiles=DEFAULT_PERCENTILES):
+        self.exact_limit = exact_limit
+        self.sketch_k = sketch_k
+        self.percentiles = tuple(percentiles)
+        self.rows = 0
+        self.columns = {}
+    
+    def update(self, df):
+        """Add one chunk of rows"""
+        self.rows += len(df)
+        for col in df.columns:
+            if col not in self.columns:
+                numeric = pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+                self.columns[col] = ColumnStats(numeric, self.exact_limit, self.sketch_k)
+            self.columns[col].update(df[col])
+        return self
+    
+    def merge(self, other):
+        """Fold a collector built over another partition"""
+        self.rows += other.rows
+        for col, stats in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(stats)
+            else:
+                self.columns[col] = stats
+        return self
+    
+    def median(self, col):
+        return self.columns[col].quantiles([0.5])[0]
+    
+    def null_counts(self):
+        return {col: stats.nulls for col, stats in self.columns.items()}
+    
+    def numeric_columns(self):
+        return [col for col, stats in self.columns.items() if stats.numeric]
+    
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'columns': {
+                col: stats.to_dict(self.percentiles)
+                for col, stats in self.columns.items()
+            }
+        }
+    
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+def collect_stats(chunks, **kwargs):
+    """Build a StatsCollector over a DataFrame or an iterable of DataFrame chunks"""
+    collector = StatsCollector(**kwargs)
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    for chunk in chunks:
+        collector.update(chunk)
+    return collector
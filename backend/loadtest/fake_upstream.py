@@ -0,0 +1,255 @@
+"""
+Local stand-in for NeighborFit's upstream data sources
+Serves paginated neighborhood data with configurable latency, error
+injection and rate limiting, entirely offline
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data_processing.fetch_data import generate_sample_neighborhoods
+
+def parse_latency(spec):
+    """
+    Build a latency sampler (seconds) from a spec string
+    
+    Supported specs, all in milliseconds:
+        constant:50
+        uniform:20,80
+        exponential:30          (mean)
+        lognormal:40,0.6        (median, sigma)
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(value) for value in params.split(',') if value]
+    
+    if kind == 'constant' and len(values) == 1:
+        delay = values[0] / 1000
+        return lambda rng: delay
+    if kind == 'uniform' and len(values) == 2:
+        low, high = values[0] / 1000, values[1] / 1000
+        return lambda rng: rng.uniform(low, high)
+    if kind == 'exponential' and len(values) == 1 and values[0] > 0:
+        mean = values[0] / 1000
+        return lambda rng: rng.expovariate(1 / mean)
+    if kind == 'lognormal' and len(values) == 2 and values[0] > 0:
+        mu, sigma = math.log(values[0] / 1000), values[1]
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    raise ValueError(f'Invalid latency spec: {spec}')
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take a token, returning 0 on success or the seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+class UpstreamState:
+    """Configuration and counters shared by all request handlers"""
+    
+    def __init__(self, total_records=1000, page_size=100, latency='constant:0', error_rate=0.0,
+                 rate_limit=None, burst=10, record_bytes=0, dirty_rate=0.0, seed=42):
+        self.total_records = total_records
+        self.page_size = page_size
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.record_bytes = record_bytes
+        self.dirty_rate = dirty_rate
+        self.seed = seed
+        self.templates = generate_sample_neighborhoods()
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0}
+    
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+    
+    def draw(self):
+        """Sample (latency, inject error) for one request"""
+        with self._lock:
+            return self.sample_latency(self._rng), self._rng.random() < self.error_rate
+    
+    def record(self, index):
+        """Deterministic synthetic neighborhood for a record index"""
+        rng = random.Random(self.seed * 1_000_003 + index)
+        template = self.templates[index % len(self.templates)]
+        
+        record = dict(template)
+        record['id'] = str(index + 1)
+        record['name'] = f"{template['name']} {index + 1}"
+        record['avg_rent'] = max(300, round(template['avg_rent'] * rng.uniform(0.8, 1.2)))
+        for field in ('safety_score', 'walkability', 'family_friendly', 'noise_level'):
+            record[field] = round(min(5, max(1, template[field] + rng.uniform(-0.5, 0.5))), 1)
+        if self.record_bytes:
+            record['description'] = (record['description'] + ' ') * (self.record_bytes // len(record['description']) + 1)
+        
+        # Dirty rows exercise the cleaning stage
+        if rng.random() < self.dirty_rate:
+            record[rng.choice(['safety_score', 'walkability', 'family_friendly', 'noise_level'])] = None
+        return record
+    
+    def page(self, page, page_size):
+        start = (page - 1) * page_size
+        end = min(start + page_size, self.total_records)
+        pages = max(1, math.ceil(self.total_records / page_size))
+        return {
+            'items': [self.record(index) for index in range(start, end)],
+            'page': page,
+            'page_size': page_size,
+            'total': self.total_records,
+            'pages': pages,
+            'next_page': page + 1 if page < pages else None
+        }
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """Handles GET /neighborhoods?page=&page_size="""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        state = self.server.state
+        state.count('requests')
+        
+        url = urlparse(self.path)
+        if url.path != '/neighborhoods':
+            self._send_json(404, {'error': 'Endpoint not found'})
+            return
+        
+        if state.rate_limiter is not None:
+            wait = state.rate_limiter.acquire()
+            if wait:
+                state.count('rate_limited')
+                self._send_json(429, {'error': 'Rate limit exceeded'}, {'Retry-After': f'{wait:.3f}'})
+                return
+        
+        latency, fail = state.draw()
+        time.sleep(latency)
+        
+        if fail:
+            state.count('errors')
+            self._send_json(503, {'error': 'Injected upstream failure'})
+            return
+        
+        query = parse_qs(url.query)
+        try:
+            page = int(query.get('page', ['1'])[0])
+            page_size = int(query.get('page_size', [str(state.page_size)])[0])
+        except ValueError:
+            self._send_json(400, {'error': 'page and page_size must be integers'})
+            return
+        if page < 1 or page_size < 1:
+            self._send_json(400, {'error': 'page and page_size must be positive'})
+            return
+        
+        state.count('ok')
+        self._send_json(200, state.page(page, page_size))
+
+class FakeUpstream:
+    """Runs the fake upstream server in a background thread"""
+    
+    def __init__(self, host='127.0.0.1', port=0, **options):
+        self.server = ThreadingHTTPServer((host, port), UpstreamHandler)
+        self.server.daemon_threads = True
+        self.server.state = UpstreamState(**options)
+        self._thread = None
+    
+    @property
+    def state(self):
+        return self.server.state
+    
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def add_upstream_arguments(parser):
+    """Command line options shared by the server and the harness"""
+    parser.add_argument('--records', type=int, default=10_000, help='Total records served')
+    parser.add_argument('--page-size', type=int, default=500, help='Default page size')
+    parser.add_argument('--latency', default='lognormal:20,0.5', help='Latency distribution, e.g. constant:50, uniform:20,80')
+    parser.add_argument('--error-rate', type=float, default=0.02, help='Fraction of requests failing with 503')
+    parser.add_argument('--rate-limit', type=float, default=None, help='Requests per second before 429s')
+    parser.add_argument('--burst', type=int, default=10, help='Rate limiter burst size')
+    parser.add_argument('--record-bytes', type=int, default=0, help='Pad each record description to about this size')
+    parser.add_argument('--dirty-rate', type=float, default=0.01, help='Fraction of records with a missing score')
+    parser.add_argument('--seed', type=int, default=42)
+
+def upstream_options(args):
+    return {
+        'total_records': args.records,
+        'page_size': args.page_size,
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'rate_limit': args.rate_limit,
+        'burst': args.burst,
+        'record_bytes': args.record_bytes,
+        'dirty_rate': args.dirty_rate,
+        'seed': args.seed
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the fake upstream data source')
+    parser.add_argument('--port', type=int, default=8001)
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+    
+    upstream = FakeUpstream(port=args.port, **upstream_options(args))
+    print(f"Fake upstream serving {args.records} records at {upstream.url}/neighborhoods")
+    try:
+        upstream.server.serve_forever()
+    except KeyboardInterrupt:
+        upstream.server.server_close()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for the NeighborFit data pipeline
+Runs the fetch and clean stages against the local fake upstream and reports
+throughput, tail latency and retry counts
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data_processing.clean_data import clean_all_data
+from data_processing.fetch_data import fetch_paginated, new_fetch_stats
+from loadtest.fake_upstream import FakeUpstream, add_upstream_arguments, upstream_options
+
+def latency_summary(latencies):
+    """Latency percentiles in milliseconds"""
+    if not latencies:
+        return {}
+    values = np.asarray(latencies) * 1000
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max())
+    }
+
+def run_once(base_url, args):
+    """Run fetch and clean once and return the measurements"""
+    stats = new_fetch_stats()
+    result = {'fetch': {}, 'clean': {}}
+    
+    start = time.perf_counter()
+    try:
+        records = fetch_paginated(
+            base_url, page_size=args.page_size, workers=args.workers, stats=stats,
+            max_retries=args.max_retries, backoff=args.backoff, timeout=args.timeout
+        )
+    except RuntimeError as e:
+        records = None
+        result['fetch']['error'] = str(e)
+    fetch_seconds = time.perf_counter() - start
+    
+    result['fetch'].update({
+        'seconds': fetch_seconds,
+        'records': len(records) if records is not None else 0,
+        'requests': stats['requests'],
+        'retries': stats['retries'],
+        'retry_reasons': stats['retry_reasons'],
+        'megabytes': stats['bytes'] / 1e6,
+        'records_per_second': (len(records) / fetch_seconds) if records else 0.0,
+        'latency': latency_summary(stats['latencies'])
+    })
+    
+    if records:
+        raw_df = pd.DataFrame(records)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            clean_df = clean_all_data(raw_df, report_filename=None)
+        clean_seconds = time.perf_counter() - start
+        result['clean'] = {
+            'seconds': clean_seconds,
+            'rows_in': len(raw_df),
+            'rows_out': len(clean_df),
+            'rows_per_second': len(raw_df) / clean_seconds
+        }
+    
+    return result
+
+def print_result(run, result):
+    fetch = result['fetch']
+    latency = fetch['latency']
+    print(f"Run {run}:")
+    print(f"  fetch: {fetch['records']} records in {fetch['seconds']:.2f}s "
+          f"({fetch['records_per_second']:,.0f} records/s, {fetch['megabytes']:.1f} MB)")
+    if latency:
+        print(f"         latency p50 {latency['p50_ms']:.1f}ms  p95 {latency['p95_ms']:.1f}ms  "
+              f"p99 {latency['p99_ms']:.1f}ms  max {latency['max_ms']:.1f}ms")
+    print(f"         {fetch['requests']} requests, {fetch['retries']} retries {fetch['retry_reasons']}")
+    if 'error' in fetch:
+        print(f"         failed: {fetch['error']}")
+    if result['clean']:
+        clean = result['clean']
+        print(f"  clean: {clean['rows_in']} -> {clean['rows_out']} rows in {clean['seconds']:.2f}s "
+              f"({clean['rows_per_second']:,.0f} rows/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_upstream_arguments(parser)
+    parser.add_argument('--upstream-url', default=None,
+                        help='Use an already running fake upstream (e.g. in another process) instead of an in-process one')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent page fetches')
+    parser.add_argument('--max-retries', type=int, default=5)
+    parser.add_argument('--backoff', type=float, default=0.05, help='Initial retry backoff in seconds')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    
+    with contextlib.ExitStack() as stack:
+        if args.upstream_url:
+            base_url = args.upstream_url.rstrip('/')
+            upstream = None
+        else:
+            upstream = stack.enter_context(FakeUpstream(**upstream_options(args)))
+            base_url = upstream.url
+        
+        results = []
+        for run in range(1, args.runs + 1):
+            result = run_once(base_url, args)
+            results.append(result)
+            if not args.json:
+                print_result(run, result)
+        
+        if upstream is not None and not args.json:
+            print(f"Upstream counters: {upstream.state.counters}")
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
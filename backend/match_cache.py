@@ -0,0 +1,133 @@
+"""
+In-process caches for the NeighborFit match API
+LRU cache with a TTL, bounded by entry count and total bytes, with
+single-flight coalescing so concurrent identical misses compute once
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class _Flight:
+    """A computation in progress that other requests for the same key wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class MatchCache:
+    """
+    Thread-safe LRU cache of encoded responses or other sized values
+    
+    Args:
+        ttl: Seconds an entry stays fresh; 0 or less disables storing
+        max_entries: Maximum number of cached entries
+        max_bytes: Maximum total size of cached values
+        size: Function returning the size in bytes of a value
+        clock: Monotonic time source, injectable for testing
+    """
+    
+    def __init__(self, ttl, max_entries=1024, max_bytes=16 * 1024 * 1024, size=len, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = size
+        self.clock = clock
+        
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing it with compute() on a miss
+        
+        key must be hashable and compute() must return a value that size
+        accepts. If another thread is already computing the same key, wait
+        for its result instead.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+            
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+                leader = True
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if flight.error is None:
+                    self._store(key, flight.value)
+            flight.done.set()
+        
+        return flight.value
+    
+    def _store(self, key, value):
+        size = self.size(value)
+        if self.ttl <= 0 or size > self.max_bytes:
+            return
+        
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._bytes += size
+        
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        self._bytes -= self.size(value)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """Counters and current size, as reported on /health"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'ttl': self.ttl
+            }
@@ -3,6 +3,13 @@ Neighborhood matching algorithm for NeighborFit
 Calculates compatibility scores based on user preferences
 """
 
+import json
+import math
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
 def get_budget_range(budget):
     """Convert budget category to rent range"""
     budget_ranges = {
@@ -61,123 +68,462 @@ def calculate_quiet_score(neighborhood_noise_level, user_wants_quiet):
         # If user doesn't mind noise, give neutral score
         return 0.5
 
-def generate_match_reasons(neighborhood, preferences, scores):
-    """Generate human-readable reasons why this neighborhood matches"""
-    reasons = []
+class ReasonRule(NamedTuple):
+    """
+    One match reason: `source`.`name` `op` `threshold`, optionally gated on
+    a preference being at least `at_least`
+    """
+    reason: str
+    source: str  # 'component' score or raw neighborhood 'field'
+    name: str
+    op: str
+    threshold: float
+    preference: str = None
+    at_least: object = True
+
+# Groups of rules; within a group the first matching rule wins
+REASON_RULES = (
+    (
+        ReasonRule('great_budget_fit', 'component', 'budget', '>', 0.8),
+        ReasonRule('good_value', 'component', 'budget', '>', 0.6)
+    ),
+    (
+        ReasonRule('excellent_safety', 'component', 'safety', '>', 0.7, 'safety_importance', 4),
+        ReasonRule('good_safety', 'component', 'safety', '>', 0.5, 'safety_importance', 3)
+    ),
+    (
+        ReasonRule('highly_walkable', 'component', 'walkability', '>', 0.7, 'walkability_importance', 4),
+        ReasonRule('good_walkability', 'component', 'walkability', '>', 0.5, 'walkability_importance', 3)
+    ),
+    (
+        ReasonRule('very_family_friendly', 'field', 'family_friendly', '>', 4.0, 'family_friendly'),
+        ReasonRule('family_amenities', 'field', 'family_friendly', '>', 3.5, 'family_friendly')
+    ),
+    (
+        ReasonRule('very_peaceful', 'field', 'noise_level', '<', 2.5, 'quiet_environment'),
+        ReasonRule('quiet_neighborhood', 'field', 'noise_level', '<', 3.5, 'quiet_environment')
+    )
+)
+
+REASON_CODES = tuple(rule.reason for group in REASON_RULES for rule in group)
+_REASON_INDEX = {reason: index for index, reason in enumerate(REASON_CODES)}
+
+# Localized reason strings, indexed like REASON_CODES
+REASON_STRINGS = {
+    'en': tuple(sys.intern(text) for text in (
+        "Great budget fit",
+        "Good value for money",
+        "Excellent safety rating",
+        "Good safety record",
+        "Highly walkable",
+        "Good walkability",
+        "Very family-friendly",
+        "Family-friendly amenities",
+        "Very peaceful environment",
+        "Quiet neighborhood"
+    ))
+}
+DEFAULT_LOCALE = 'en'
+
+_OPERATORS = {'>': np.greater, '<': np.less}
+
+def match_reason_codes(preferences, components, fields):
+    """
+    Evaluate REASON_RULES as boolean masks over a set of candidates
+    
+    Args:
+        preferences: Preferences
+        components: Component name -> array of unweighted scores per candidate
+        fields: Neighborhood field name -> array of raw values per candidate
+    
+    Returns:
+        Integer array of shape (candidates, rule groups) holding the index
+        into REASON_CODES of the matching rule, or -1
+    """
+    sources = {'component': components, 'field': fields}
+    count = len(next(iter(components.values())))
+    codes = np.full((count, len(REASON_RULES)), -1, dtype=np.int8)
+    
+    for column, group in enumerate(REASON_RULES):
+        # Apply later rules first so earlier ones overwrite them
+        for rule in reversed(group):
+            if rule.preference is not None and not getattr(preferences, rule.preference) >= rule.at_least:
+                continue
+            mask = _OPERATORS[rule.op](sources[rule.source][rule.name], rule.threshold)
+            codes[mask, column] = _REASON_INDEX[rule.reason]
+    
+    return codes
+
+def reason_strings(codes, locale=DEFAULT_LOCALE):
+    """Turn match_reason_codes output into lists of localized reason strings"""
+    strings = REASON_STRINGS.get(locale, REASON_STRINGS[DEFAULT_LOCALE])
+    return [[strings[code] for code in row if code >= 0] for row in codes.tolist()]
+
+def generate_match_reasons(neighborhood, preferences, scores, locale=DEFAULT_LOCALE):
+    """Generate human-readable reasons why this neighborhood matches the preferences"""
+    preferences = as_preferences(preferences)
+    components = {name: np.array([score], dtype=np.float64) for name, score in scores.items()}
+    fields = {
+        field: np.array([neighborhood[field]], dtype=np.float64)
+        for field in {rule.name for group in REASON_RULES for rule in group if rule.source == 'field'}
+    }
+    return reason_strings(match_reason_codes(preferences, components, fields), locale)[0]
+
+# Component weights used when no profile is requested
+# Weights: Budget (30%), Safety (25%), Walkability (20%), Family (15%), Quiet (10%)
+DEFAULT_PROFILE = 'default'
+DEFAULT_WEIGHTS = {
+    'budget': 0.30,
+    'safety': 0.25,
+    'walkability': 0.20,
+    'family': 0.15,
+    'quiet': 0.10
+}
+COMPONENTS = tuple(DEFAULT_WEIGHTS)
+
+class Preferences(NamedTuple):
+    """Normalized, hashable user preferences consumed by the scoring engine"""
+    budget: str
+    safety_importance: float
+    walkability_importance: float
+    family_friendly: bool
+    quiet_environment: bool
+    profile: str = DEFAULT_PROFILE
+
+def as_preferences(preferences):
+    """Accept either Preferences or a /match style preferences dictionary"""
+    if isinstance(preferences, Preferences):
+        return preferences
+    return Preferences(
+        budget=preferences['budget'],
+        safety_importance=preferences['safetyImportance'],
+        walkability_importance=preferences['walkabilityImportance'],
+        family_friendly=bool(preferences['familyFriendly']),
+        quiet_environment=bool(preferences['quietEnvironment']),
+        profile=preferences.get('profile', DEFAULT_PROFILE)
+    )
+
+BUDGET_LEVELS = ('low', 'medium', 'high')
+IMPORTANCE_LEVELS = (1, 2, 3, 4, 5)
+
+# Fields every neighborhood needs to be scored and returned
+NUMERIC_FIELDS = ('avg_rent', 'safety_score', 'walkability', 'family_friendly', 'noise_level')
+REQUIRED_FIELDS = ('id', 'name', 'description', 'highlights') + NUMERIC_FIELDS
+
+def validate_weights(weights):
+    """Validate a weight profile and return it as a plain dictionary of floats"""
+    if not isinstance(weights, dict):
+        raise ValueError('weight profile must be an object')
+    
+    missing = [name for name in COMPONENTS if name not in weights]
+    if missing:
+        raise ValueError(f'missing weights: {missing}')
+    
+    unknown = [name for name in weights if name not in COMPONENTS]
+    if unknown:
+        raise ValueError(f'unknown weights: {unknown}')
+    
+    validated = {}
+    for name in COMPONENTS:
+        value = weights[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+            raise ValueError(f'weight {name} must be a finite non-negative number')
+        validated[name] = float(value)
+    
+    # Keep matchScore a percentage
+    if not math.isclose(sum(validated.values()), 1.0, abs_tol=1e-6):
+        raise ValueError('weights must sum to 1')
+    
+    return validated
+
+def load_weight_profiles(path):
+    """
+    Load named weight profiles from a JSON file
+    
+    The file maps profile names to weight objects, e.g.
+    {"urban": {"budget": 0.2, "safety": 0.2, "walkability": 0.4, "family": 0.1, "quiet": 0.1}}
+    
+    The default profile is always present and invalid profiles are skipped.
+    """
+    profiles = {DEFAULT_PROFILE: dict(DEFAULT_WEIGHTS)}
+    
+    try:
+        with open(path) as f:
+            raw_profiles = json.load(f)
+    except FileNotFoundError:
+        return profiles
+    except ValueError as e:
+        print(f"Error loading weight profiles from {path}: {e}")
+        return profiles
+    
+    if not isinstance(raw_profiles, dict):
+        print(f"Error loading weight profiles from {path}: expected an object of profiles")
+        return profiles
+    
+    for name, weights in raw_profiles.items():
+        try:
+            profiles[name] = validate_weights(weights)
+        except ValueError as e:
+            print(f"Skipping weight profile {name}: {e}")
+    
+    return profiles
+
+def _importance_slot(importance):
+    """Return the table row for an importance level, or None for fractional values"""
+    if importance in IMPORTANCE_LEVELS and float(importance).is_integer():
+        return int(importance) - 1
+    return None
+
+class NeighborhoodCatalog:
+    """
+    Columnar, preference-independent view of the neighborhood data
     
-    # Budget reasons
-    if scores['budget'] > 0.8:
-        reasons.append("Great budget fit")
-    elif scores['budget'] > 0.6:
-        reasons.append("Good value for money")
+    Every component score that depends only on a neighborhood and a discrete
+    preference value is computed once here, using the same arithmetic as the
+    scalar calculate_*_score helpers so that results match them exactly.
+    """
     
-    # Safety reasons
-    if scores['safety'] > 0.7 and preferences['safetyImportance'] >= 4:
-        reasons.append("Excellent safety rating")
-    elif scores['safety'] > 0.5 and preferences['safetyImportance'] >= 3:
-        reasons.append("Good safety record")
+    def __init__(self, neighborhoods):
+        rows = []
+        values = []
+        
+        for neighborhood in neighborhoods:
+            missing = [field for field in REQUIRED_FIELDS if field not in neighborhood]
+            if missing:
+                print(f"Missing field in neighborhood data: {missing[0]!r}")
+                continue
+            
+            try:
+                row_values = [float(neighborhood[field]) for field in NUMERIC_FIELDS]
+            except (TypeError, ValueError) as e:
+                print(f"Error processing neighborhood {neighborhood.get('name', 'Unknown')}: {e}")
+                continue
+            
+            if not np.all(np.isfinite(row_values)):
+                print(f"Error processing neighborhood {neighborhood.get('name', 'Unknown')}: non-numeric score")
+                continue
+            
+            rows.append(neighborhood)
+            values.append(row_values)
+        
+        self.rows = rows
+        columns = np.array(values, dtype=np.float64).reshape(len(rows), len(NUMERIC_FIELDS)).T
+        rent, safety, walkability, family_friendly, noise_level = columns
+        
+        # Raw numeric fields, used by the match reason rules
+        self.fields = dict(zip(NUMERIC_FIELDS, columns))
+        
+        # Deterministic tie-break for equal match scores
+        self.id_order = self._id_order([row['id'] for row in rows])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.tables = {
+                'budget': np.stack([self._budget_scores(rent, budget) for budget in BUDGET_LEVELS]),
+                'safety': np.stack([np.minimum(safety / 5, 1) * (level / 5.0) for level in IMPORTANCE_LEVELS]),
+                'walkability': np.stack([np.minimum(walkability / 5, 1) * (level / 5.0) for level in IMPORTANCE_LEVELS]),
+                'family': np.stack([np.full_like(family_friendly, 0.5), np.minimum(family_friendly / 5, 1) * 0.8]),
+                'quiet': np.stack([np.full_like(noise_level, 0.5), (5 - noise_level) / 5 * 0.7])
+            }
+        
+        # Normalized scores for importance levels that are not whole numbers
+        self.normalized = {
+            'safety': np.minimum(safety / 5, 1),
+            'walkability': np.minimum(walkability / 5, 1)
+        }
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    @staticmethod
+    def _id_order(ids):
+        """Position of every row when sorted by id, numeric ids first in numeric order"""
+        def sort_key(row):
+            value = ids[row]
+            try:
+                return (0, float(value), '')
+            except (TypeError, ValueError):
+                return (1, 0.0, str(value))
+        
+        order = sorted(range(len(ids)), key=sort_key)
+        id_order = np.empty(len(ids), dtype=np.int64)
+        id_order[order] = np.arange(len(ids))
+        return id_order
+    
+    @staticmethod
+    def _budget_scores(rent, budget):
+        """Vectorized calculate_budget_score for one budget category"""
+        min_rent, max_rent = get_budget_range(budget)
+        reference = 2000 if max_rent == float('inf') else max_rent
+        
+        scores = np.ones_like(rent)
+        below = rent < min_rent
+        above = rent > max_rent
+        scores[below] = np.maximum(0.5, 1 - (min_rent - rent[below]) / min_rent)
+        scores[above] = np.maximum(0, 1 - (rent[above] - reference) / reference)
+        return scores
+    
+    def component_columns(self, preferences):
+        """Return the unweighted score column of every component for a set of preferences"""
+        safety_slot = _importance_slot(preferences.safety_importance)
+        walkability_slot = _importance_slot(preferences.walkability_importance)
+        
+        return {
+            'budget': self.tables['budget'][BUDGET_LEVELS.index(preferences.budget)],
+            'safety': (self.tables['safety'][safety_slot] if safety_slot is not None
+                       else self.normalized['safety'] * (preferences.safety_importance / 5.0)),
+            'walkability': (self.tables['walkability'][walkability_slot] if walkability_slot is not None
+                            else self.normalized['walkability'] * (preferences.walkability_importance / 5.0)),
+            'family': self.tables['family'][int(preferences.family_friendly)],
+            'quiet': self.tables['quiet'][int(preferences.quiet_environment)]
+        }
+
+class ScoringKernel:
+    """
+    Weight profile compiled against a NeighborhoodCatalog
     
-    # Walkability reasons
-    if scores['walkability'] > 0.7 and preferences['walkabilityImportance'] >= 4:
-        reasons.append("Highly walkable")
-    elif scores['walkability'] > 0.5 and preferences['walkabilityImportance'] >= 3:
-        reasons.append("Good walkability")
+    Each component table is pre-multiplied by its weight at load time, so
+    scoring a request with any profile is four vector additions of table
+    rows picked by the preferences.
+    """
     
-    # Family reasons
-    if preferences['familyFriendly'] and neighborhood['family_friendly'] > 4.0:
-        reasons.append("Very family-friendly")
-    elif preferences['familyFriendly'] and neighborhood['family_friendly'] > 3.5:
-        reasons.append("Family-friendly amenities")
+    def __init__(self, catalog, weights=None):
+        self.catalog = catalog
+        self.weights = validate_weights(weights if weights is not None else DEFAULT_WEIGHTS)
+        self.tables = {
+            name: table * self.weights[name]
+            for name, table in catalog.tables.items()
+        }
     
-    # Quiet reasons
-    if preferences['quietEnvironment'] and neighborhood['noise_level'] < 2.5:
-        reasons.append("Very peaceful environment")
-    elif preferences['quietEnvironment'] and neighborhood['noise_level'] < 3.5:
-        reasons.append("Quiet neighborhood")
+    def total_scores(self, preferences):
+        """Weighted total score of every neighborhood in the catalog"""
+        safety_slot = _importance_slot(preferences.safety_importance)
+        walkability_slot = _importance_slot(preferences.walkability_importance)
+        
+        if safety_slot is None or walkability_slot is None:
+            # Fractional importance: weight the unweighted columns directly
+            columns = self.catalog.component_columns(preferences)
+            return (
+                columns['budget'] * self.weights['budget'] +
+                columns['safety'] * self.weights['safety'] +
+                columns['walkability'] * self.weights['walkability'] +
+                columns['family'] * self.weights['family'] +
+                columns['quiet'] * self.weights['quiet']
+            )
+        
+        return (
+            self.tables['budget'][BUDGET_LEVELS.index(preferences.budget)] +
+            self.tables['safety'][safety_slot] +
+            self.tables['walkability'][walkability_slot] +
+            self.tables['family'][int(preferences.family_friendly)] +
+            self.tables['quiet'][int(preferences.quiet_environment)]
+        )
     
-    return reasons
+    def rank(self, preferences, limit=3):
+        """
+        Return (row positions, match percentages) of the best matches
+        
+        Matches are ordered by match percentage, highest first, then by id.
+        Pass limit=None to rank the whole catalog.
+        """
+        match_percentages = np.round(self.total_scores(preferences) * 100).astype(np.int64)
+        
+        # Unique sort key: higher percentage first, ties broken by id
+        keys = -match_percentages * len(self.catalog) + self.catalog.id_order
+        
+        if limit is None or limit >= len(keys):
+            order = np.argsort(keys)
+        else:
+            candidates = np.argpartition(keys, limit - 1)[:limit] if limit > 0 else np.empty(0, dtype=np.int64)
+            order = candidates[np.argsort(keys[candidates])]
+        
+        return order, match_percentages[order]
 
-def calculate_neighborhood_matches(neighborhoods, preferences):
+def static_match_fields(neighborhood):
+    """Fields of a match object that do not depend on the user's preferences"""
+    return {
+        'id': neighborhood['id'],
+        'name': neighborhood['name'],
+        'description': neighborhood['description'],
+        'avgRent': neighborhood['avg_rent'],
+        'safetyScore': neighborhood['safety_score'],
+        'walkabilityScore': neighborhood['walkability'],
+        'familyFriendlyScore': neighborhood['family_friendly'],
+        'noiseLevel': neighborhood['noise_level'],
+        'highlights': neighborhood['highlights'].split(';') if isinstance(neighborhood['highlights'], str) else neighborhood['highlights']
+    }
+
+def rank_matches(kernel, preferences, limit=3, locale=DEFAULT_LOCALE):
+    """
+    Score every neighborhood and build the per-request fields of the best matches
+    
+    Args:
+        kernel: ScoringKernel for the requested weight profile
+        preferences: Preferences
+        limit: Number of matches to return
+        locale: Language of the match reasons
+    
+    Returns:
+        List of (catalog row position, match score, match reasons, component scores)
+        tuples, best match first
+    """
+    positions, match_percentages = kernel.rank(preferences, limit)
+    return build_matches(kernel.catalog, preferences, positions, match_percentages, locale)
+
+def build_matches(catalog, preferences, positions, match_percentages, locale=DEFAULT_LOCALE):
+    """
+    Build the per-request fields for already ranked catalog rows
+    
+    Returns:
+        List of (catalog row position, match score, match reasons, component scores)
+        tuples in the given order
+    """
+    # Only the returned rows get component scores and reasons
+    components = {
+        name: column[positions]
+        for name, column in catalog.component_columns(preferences).items()
+    }
+    fields = {name: column[positions] for name, column in catalog.fields.items()}
+    match_reasons = reason_strings(match_reason_codes(preferences, components, fields), locale)
+    component_percentages = {
+        name: np.round(scores * 100).astype(np.int64).tolist()
+        for name, scores in components.items()
+    }
+    
+    return [
+        (
+            position,
+            int(match_percentage),
+            match_reasons[row],
+            {name: percentages[row] for name, percentages in component_percentages.items()}
+        )
+        for row, (position, match_percentage) in enumerate(zip(positions.tolist(), match_percentages.tolist()))
+    ]
+
+def calculate_neighborhood_matches(neighborhoods, preferences, kernel=None):
     """
     Main function to calculate neighborhood matches
     
     Args:
         neighborhoods: List of neighborhood dictionaries
-        preferences: User preferences dictionary
+        preferences: User preferences dictionary or Preferences
+        kernel: Optional ScoringKernel compiled from the same neighborhoods;
+            one with the default weights is compiled on the fly if omitted
     
     Returns:
         List of top 3 matching neighborhoods with scores and reasons
     """
+    if kernel is None:
+        kernel = ScoringKernel(NeighborhoodCatalog(neighborhoods))
+    
     matches = []
+    for position, match_score, match_reasons, component_scores in rank_matches(kernel, as_preferences(preferences)):
+        match = static_match_fields(kernel.catalog.rows[position])
+        match['matchScore'] = match_score
+        match['matchReasons'] = match_reasons
+        match['componentScores'] = component_scores
+        matches.append(match)
     
-    for neighborhood in neighborhoods:
-        try:
-            # Calculate individual component scores
-            budget_score = calculate_budget_score(neighborhood['avg_rent'], preferences['budget'])
-            safety_score = calculate_safety_score(neighborhood['safety_score'], preferences['safetyImportance'])
-            walkability_score = calculate_walkability_score(neighborhood['walkability'], preferences['walkabilityImportance'])
-            family_score = calculate_family_score(neighborhood['family_friendly'], preferences['familyFriendly'])
-            quiet_score = calculate_quiet_score(neighborhood['noise_level'], preferences['quietEnvironment'])
-            
-            # Store individual scores for reason generation
-            component_scores = {
-                'budget': budget_score,
-                'safety': safety_score,
-                'walkability': walkability_score,
-                'family': family_score,
-                'quiet': quiet_score
-            }
-            
-            # Calculate weighted total score
-            # Weights: Budget (30%), Safety (25%), Walkability (20%), Family (15%), Quiet (10%)
-            total_score = (
-                budget_score * 0.30 +
-                safety_score * 0.25 +
-                walkability_score * 0.20 +
-                family_score * 0.15 +
-                quiet_score * 0.10
-            )
-            
-            # Convert to percentage
-            match_percentage = round(total_score * 100)
-            
-            # Generate match reasons
-            match_reasons = generate_match_reasons(neighborhood, preferences, component_scores)
-            
-            # Create match object
-            match = {
-                'id': neighborhood['id'],
-                'name': neighborhood['name'],
-                'description': neighborhood['description'],
-                'avgRent': neighborhood['avg_rent'],
-                'safetyScore': neighborhood['safety_score'],
-                'walkabilityScore': neighborhood['walkability'],
-                'familyFriendlyScore': neighborhood['family_friendly'],
-                'noiseLevel': neighborhood['noise_level'],
-                'highlights': neighborhood['highlights'].split(';') if isinstance(neighborhood['highlights'], str) else neighborhood['highlights'],
-                'matchScore': match_percentage,
-                'matchReasons': match_reasons,
-                'componentScores': {
-                    'budget': round(budget_score * 100),
-                    'safety': round(safety_score * 100),
-                    'walkability': round(walkability_score * 100),
-                    'family': round(family_score * 100),
-                    'quiet': round(quiet_score * 100)
-                }
-            }
-            
-            matches.append(match)
-            
-        except KeyError as e:
-            print(f"Missing field in neighborhood data: {e}")
-            continue
-        except Exception as e:
-            print(f"Error processing neighborhood {neighborhood.get('name', 'Unknown')}: {e}")
-            continue
-    
-    # Sort by match score (highest first) and return top 3
-    matches.sort(key=lambda x: x['matchScore'], reverse=True)
-    return matches[:3]
+    return matches
 
 def get_match_quality_label(score):
     """Convert match score to quality label"""
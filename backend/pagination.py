@@ -0,0 +1,70 @@
+"""
+Cursor-based pagination over ranked NeighborFit match results
+The first page ranks the whole catalog once into a compact RankedIndex;
+later pages slice it, so each page costs O(page size)
+"""
+
+import base64
+import hashlib
+import json
+
+import numpy as np
+
+class CursorError(ValueError):
+    """Malformed cursor, or one issued for different preferences"""
+
+class StaleCursorError(CursorError):
+    """Cursor issued for a previous dataset version"""
+
+class RankedIndex:
+    """Catalog row positions and match percentages in rank order"""
+    
+    def __init__(self, positions, match_percentages):
+        self.positions = positions.astype(np.int32)
+        self.match_percentages = match_percentages.astype(np.int16)
+    
+    def __len__(self):
+        return len(self.positions)
+    
+    @property
+    def nbytes(self):
+        return self.positions.nbytes + self.match_percentages.nbytes
+    
+    def page(self, offset, limit):
+        """Row positions and match percentages of one page"""
+        end = offset + limit
+        return self.positions[offset:end], self.match_percentages[offset:end]
+
+def build_ranked_index(kernel, preferences):
+    """Rank every neighborhood in the kernel's catalog for a set of preferences"""
+    positions, match_percentages = kernel.rank(preferences, limit=None)
+    return RankedIndex(positions, match_percentages)
+
+def preferences_digest(preferences):
+    """Short digest of Preferences that is stable across processes"""
+    return hashlib.sha256(repr(tuple(preferences)).encode('utf-8')).hexdigest()[:16]
+
+def encode_cursor(preferences, dataset_version, offset):
+    """Opaque cursor for the page starting at offset"""
+    payload = json.dumps([dataset_version, offset, preferences_digest(preferences)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, preferences, dataset_version):
+    """
+    Return the page offset encoded in a cursor
+    
+    Raises:
+        CursorError: if the cursor is malformed or was issued for other preferences
+        StaleCursorError: if the dataset changed since the cursor was issued
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        version, offset, digest = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeEncodeError):
+        raise CursorError('Invalid cursor')
+    
+    if type(offset) is not int or offset < 0 or digest != preferences_digest(preferences):
+        raise CursorError('Invalid cursor')
+    if version != dataset_version:
+        raise StaleCursorError('Cursor expired: the neighborhood data has changed')
+    return offset
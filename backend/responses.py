@@ -0,0 +1,62 @@
+"""
+JSON response encoding for NeighborFit match results
+Pre-encodes the static part of every neighborhood once at load time so that
+building a /match response only serializes the per-request score fields
+"""
+
+import json
+
+from matching import COMPONENTS, static_match_fields
+
+def encode_json(value):
+    """Compact JSON encoding as UTF-8 bytes"""
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+# Per-request part of a match object; static fields are spliced in front of it
+_COMPONENT_SCORES_TEMPLATE = (
+    '"componentScores":{' +
+    ','.join(f'"{name}":%d' for name in COMPONENTS) +
+    '}}'
+).encode('utf-8')
+
+class MatchEncoder:
+    """
+    Encodes ranked matches for one NeighborhoodCatalog into JSON bytes
+    
+    The static fields of each neighborhood are encoded once, without the
+    closing brace, and reused by every response. Reason strings come from a
+    small fixed vocabulary and are memoized after their first encoding.
+    """
+    
+    def __init__(self, catalog):
+        self.fragments = [
+            encode_json(static_match_fields(neighborhood))[:-1]
+            for neighborhood in catalog.rows
+        ]
+        self._encoded_strings = {}
+    
+    def _encode_string(self, value):
+        encoded = self._encoded_strings.get(value)
+        if encoded is None:
+            encoded = self._encoded_strings[value] = encode_json(value)
+        return encoded
+    
+    def encode_match(self, position, match_score, match_reasons, component_scores):
+        """Encode one match object from the output of matching.rank_matches"""
+        return b''.join((
+            self.fragments[position],
+            b',"matchScore":%d,"matchReasons":[' % match_score,
+            b','.join([self._encode_string(reason) for reason in match_reasons]),
+            b'],',
+            _COMPONENT_SCORES_TEMPLATE % tuple(component_scores[name] for name in COMPONENTS)
+        ))
+    
+    def encode_matches_response(self, ranked, total_neighborhoods, next_cursor=None):
+        """Encode the /match response body for a page of ranked matches"""
+        return b''.join((
+            b'{"success":true,"matches":[',
+            b','.join([self.encode_match(*match) for match in ranked]),
+            b'],"total_neighborhoods":%d,"next_cursor":' % total_neighborhoods,
+            encode_json(next_cursor),
+            b'}'
+        ))
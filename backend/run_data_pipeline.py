@@ -4,18 +4,40 @@ Complete data pipeline runner for NeighborFit
 Fetches, cleans, and prepares neighborhood data
 """
 
+import argparse
 import sys
 import os
+import time
 from datetime import datetime
 
+import pandas as pd
+
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(__file__))
 
+from data_processing import clean_data as clean_data_module, fetch_data, stats
+from data_processing.cache import ArtifactCache, code_version
+from data_processing.changelog import compute_diff, record_changes
 from data_processing.fetch_data import fetch_all_data, save_raw_data
-from data_processing.clean_data import clean_all_data, save_clean_data
+from data_processing.clean_data import clean_all_data, generate_data_quality_report, save_clean_data
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+DEFAULT_CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+
+def print_cache_report(stage_runs):
+    """Print which stages were served from the artifact cache"""
+    print("Stage cache report:")
+    for run in stage_runs:
+        print(f"  {run['stage']:<6} {run['status']:<8} {run['elapsed']:.3f}s (saved {run['saved']:.3f}s)")
+    print(f"  Total time saved: {sum(run['saved'] for run in stage_runs):.3f}s")
 
-def run_complete_pipeline():
-    """Run the complete data processing pipeline"""
+def run_complete_pipeline(force=False, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Run the complete data processing pipeline
+    
+    Stage outputs are cached under a hash of their inputs and code, so
+    unchanged stages are skipped unless force is set.
+    """
     print("=" * 60)
     print("NEIGHBORFIT DATA PROCESSING PIPELINE")
     print("=" * 60)
@@ -23,22 +45,57 @@ def run_complete_pipeline():
     print()
     
     try:
+        cache = ArtifactCache(cache_dir)
+        stage_runs = []
+        
         # Step 1: Fetch raw data
         print("STEP 1: Fetching raw data...")
-        raw_data = fetch_all_data()
-        raw_file = save_raw_data(raw_data)
-        print(f"✓ Raw data saved: {raw_file}")
+        if os.environ.get('UPSTREAM_API_URL'):
+            # A live upstream can change without our code changing, so never cache it
+            start = time.perf_counter()
+            raw_df = pd.DataFrame(fetch_all_data())
+            run = {'stage': 'fetch', 'status': 'uncached', 'elapsed': time.perf_counter() - start, 'saved': 0.0}
+        else:
+            raw_df, run = cache.run_stage(
+                'fetch', code_version(fetch_data), [],
+                lambda: pd.DataFrame(fetch_all_data()), force=force
+            )
+        stage_runs.append(run)
+        raw_file = save_raw_data(raw_df)
+        print(f"✓ Raw data saved: {raw_file} (cache {run['status']})")
         print()
         
-        # Step 2: Clean and process data
+        # Step 2: Clean and process data, handing the fetched frame over in memory
         print("STEP 2: Cleaning and processing data...")
-        clean_data = clean_all_data()
-        clean_file = save_clean_data(clean_data)
+        clean_data, run = cache.run_stage(
+            'clean', code_version(clean_data_module, stats), [raw_df],
+            lambda: clean_all_data(raw_df), force=force
+        )
+        stage_runs.append(run)
+        if run['status'] == 'hit':
+            # The quality report is written by clean_all_data, which a hit skips
+            generate_data_quality_report(clean_data)
+        # Staged next to the served file; it only replaces it once the changelog is written
+        staged_file = save_clean_data(clean_data, 'neighborhood_data.csv.tmp')
+        print(f"✓ Clean data staged: {staged_file} (cache {run['status']})")
+        print()
+        
+        # Step 3: Diff against the previous clean artifact as served by the API
+        print("STEP 3: Recording dataset changes...")
+        clean_file = os.path.join(DATA_DIR, 'neighborhood_data.csv')
+        if os.path.exists(clean_file):
+            diff = compute_diff(pd.read_csv(clean_file), pd.read_csv(staged_file))
+            version = record_changes(DATA_DIR, diff)
+            print(f"✓ Dataset version {version}: {len(diff['added'])} added, "
+                  f"{len(diff['removed'])} removed, {len(diff['changed'])} changed")
+        else:
+            print("✓ No previous clean data, skipping changelog")
+        os.replace(staged_file, clean_file)
         print(f"✓ Clean data saved: {clean_file}")
         print()
         
-        # Step 3: Validation
-        print("STEP 3: Final validation...")
+        # Step 4: Validation
+        print("STEP 4: Final validation...")
         print(f"✓ Total neighborhoods processed: {len(clean_data)}")
         print(f"✓ Data columns: {list(clean_data.columns)}")
         
@@ -51,6 +108,9 @@ def run_complete_pipeline():
         else:
             print("✓ All required columns present")
         
+        print()
+        print_cache_report(stage_runs)
+        
         print()
         print("=" * 60)
         print("PIPELINE COMPLETED SUCCESSFULLY!")
@@ -65,5 +125,10 @@ def run_complete_pipeline():
         return False
 
 if __name__ == "__main__":
-    success = run_complete_pipeline()
+    parser = argparse.ArgumentParser(description='Run the NeighborFit data processing pipeline')
+    parser.add_argument('--force', action='store_true', help='Recompute every stage, bypassing the artifact cache')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Directory for cached stage artifacts')
+    args = parser.parse_args()
+    
+    success = run_complete_pipeline(force=args.force, cache_dir=args.cache_dir)
     sys.exit(0 if success else 1)
\ No newline at end of file
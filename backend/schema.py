@@ -0,0 +1,105 @@
+"""
+Request schema for the NeighborFit match API
+Validates and normalizes a /match payload into a Preferences struct in one pass
+"""
+
+from typing import NamedTuple, Optional
+
+from matching import BUDGET_LEVELS, DEFAULT_PROFILE, Preferences
+
+class ValidationError(ValueError):
+    """Invalid request payload; the message is returned to the client"""
+
+class MatchRequest(NamedTuple):
+    """Validated /match request: what to rank, and which page of it"""
+    preferences: Preferences
+    limit: int
+    cursor: Optional[str] = None
+
+# Required payload fields, in the order missing fields are reported
+MATCH_REQUEST_FIELDS = ('budget', 'safetyImportance', 'walkabilityImportance', 'familyFriendly', 'quietEnvironment')
+
+# bool is an int subclass, but true/false is not an importance level
+_NUMBER_TYPES = frozenset((int, float))
+
+def _importance(value):
+    """Return a valid importance level, with whole numbers as int, or None"""
+    if type(value) in _NUMBER_TYPES and 1 <= value <= 5:
+        return int(value) if value % 1 == 0 else value
+    return None
+
+def compile_match_schema(profiles, default_limit=3, max_limit=100):
+    """
+    Compile the /match request schema for a set of weight profile names
+    
+    Returns a function that turns a decoded JSON payload into a MatchRequest,
+    raising ValidationError with the API's error message on invalid input.
+    Missing fields are reported before invalid values, as before.
+    """
+    profiles = frozenset(profiles)
+    budget_levels = frozenset(BUDGET_LEVELS)
+    field_count = len(MATCH_REQUEST_FIELDS)
+    new_tuple = tuple.__new__
+    
+    def validate(payload):
+        if type(payload) is not dict:
+            raise ValidationError('Request must be a JSON object')
+        
+        try:
+            budget = payload['budget']
+            safety_importance = payload['safetyImportance']
+            walkability_importance = payload['walkabilityImportance']
+            family_friendly = payload['familyFriendly']
+            quiet_environment = payload['quietEnvironment']
+        except KeyError:
+            for field in MATCH_REQUEST_FIELDS:
+                if field not in payload:
+                    raise ValidationError(f'Missing required field: {field}')
+        
+        if type(budget) is not str or budget not in budget_levels:
+            raise ValidationError('Budget must be low, medium, or high')
+        
+        # Integer levels are already normalized; only other values need _importance
+        if type(safety_importance) is not int or not 1 <= safety_importance <= 5:
+            safety_importance = _importance(safety_importance)
+            if safety_importance is None:
+                raise ValidationError('Safety importance must be between 1 and 5')
+        
+        if type(walkability_importance) is not int or not 1 <= walkability_importance <= 5:
+            walkability_importance = _importance(walkability_importance)
+            if walkability_importance is None:
+                raise ValidationError('Walkability importance must be between 1 and 5')
+        
+        if family_friendly is not True and family_friendly is not False:
+            raise ValidationError('Family friendly must be true or false')
+        
+        if quiet_environment is not True and quiet_environment is not False:
+            raise ValidationError('Quiet environment must be true or false')
+        
+        # Common case: only the required fields, so every optional one is defaulted
+        if len(payload) == field_count:
+            preferences = new_tuple(Preferences, (
+                budget, safety_importance, walkability_importance,
+                family_friendly, quiet_environment, DEFAULT_PROFILE
+            ))
+            return new_tuple(MatchRequest, (preferences, default_limit, None))
+        
+        profile = payload.get('profile', DEFAULT_PROFILE)
+        if type(profile) is not str or profile not in profiles:
+            raise ValidationError(f'Unknown weight profile: {profile}')
+        
+        limit = payload.get('limit', default_limit)
+        if type(limit) is not int or not 1 <= limit <= max_limit:
+            raise ValidationError(f'Limit must be an integer between 1 and {max_limit}')
+        
+        cursor = payload.get('cursor')
+        if cursor is not None and type(cursor) is not str:
+            raise ValidationError('Cursor must be a string')
+        
+        preferences = new_tuple(Preferences, (
+            budget, safety_importance, walkability_importance,
+            family_friendly, quiet_environment, profile
+        ))
+        return new_tuple(MatchRequest, (preferences, limit, cursor))
+    
+    return validate